@@ -372,7 +372,7 @@ def get_airbyte_destination(request, destination_id):
     if orguser.org.airbyte_workspace_id is None:
         raise HttpError(400, "create an airbyte workspace first")
 
-    res = airbyte_service.get_destination(orguser.org.airbyte_workspace_id, destination_id)
+    res = airbyte_service.get_destination_cached(orguser.org.airbyte_workspace_id, destination_id)
     logger.debug(res)
     return res
 
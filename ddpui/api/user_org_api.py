@@ -1,10 +1,11 @@
 import json
 from typing import List
 
-from dotenv import load_dotenv
 from ninja import Router
 from ninja.errors import HttpError
-from rest_framework.authtoken import views
+from ninja.responses import Response
+from rest_framework.authtoken.models import Token
+from rest_framework.authtoken.serializers import AuthTokenSerializer
 from django.utils.text import slugify
 from django.db.models import Prefetch
 from django.contrib.auth.models import User
@@ -40,11 +41,11 @@ from ddpui.utils.custom_logger import CustomLogger
 from ddpui.utils.deleteorg import delete_warehouse_v1
 from ddpui.models.org import OrgWarehouse, Org, OrgType
 from ddpui.ddpairbyte import airbytehelpers
+from ddpui.celeryworkers.tasks import create_airbyte_destination
 from ddpui.models.org_preferences import OrgPreferences
 from django.db import transaction
 
 user_org_router = Router()
-load_dotenv()
 logger = CustomLogger("ddpui")
 
 
@@ -71,7 +72,7 @@ def get_current_user_v2(request, org_slug: str = None):
         org_preferences = OrgPreferences.objects.create(org=org)
 
     res = []
-    for curr_orguser in curr_orgusers.prefetch_related(
+    for curr_orguser in curr_orgusers.select_related("org", "org__org_plans").prefetch_related(
         Prefetch(
             "new_role",
             queryset=Role.objects.prefetch_related(
@@ -83,20 +84,15 @@ def get_current_user_v2(request, org_slug: str = None):
                 )
             ),
         ),
-        Prefetch(
-            "org",
-            queryset=Org.objects.prefetch_related(
-                "orgtncs",  # Assuming 'orgtnc' is a related name from Org to its related model
-            ),
-        ),
+        "org__orgtncs",
     ):
         if curr_orguser.org.orgtncs.exists():
             curr_orguser.org.tnc_accepted = curr_orguser.org.orgtncs.exists()
 
         res.append(
-            OrgUserResponse(
+            OrgUserResponse.construct(
                 email=user.email,
-                org=curr_orguser.org,
+                org=OrgSchema.from_orm(curr_orguser.org),
                 active=user.is_active,
                 role=curr_orguser.role,
                 role_slug=slugify(OrgUserRole(curr_orguser.role).name),
@@ -122,7 +118,6 @@ def post_organization_user(request, payload: OrgUserCreate):  # pylint: disable=
     creates a new OrgUser having specified email + password.
     no Org is created or attached at this time
     """
-    payload.email = payload.email.lower().strip()
     retval, error = orguserfunctions.signup_orguser(payload)
     if error:
         raise HttpError(400, error)
@@ -132,14 +127,15 @@ def post_organization_user(request, payload: OrgUserCreate):  # pylint: disable=
 @user_org_router.post("/login/")
 def post_login(request):
     """Uses the username and password in the request to return an auth token"""
-    request_obj = json.loads(request.body)
-    token = views.obtain_auth_token(request)
-    if "token" in token.data:
-        retval = orguserfunctions.lookup_user(request_obj["username"])
-        retval["token"] = token.data["token"]
-        return retval
-
-    return token
+    # drf's serializer keeps the error responses the frontend already parses
+    serializer = AuthTokenSerializer(data=json.loads(request.body), context={"request": request})
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=400)
+
+    token, _ = Token.objects.get_or_create(user=serializer.validated_data["user"])
+    retval = orguserfunctions.lookup_user(serializer.validated_data["username"])
+    retval["token"] = token.key
+    return retval
 
 
 @user_org_router.get(
@@ -150,43 +146,35 @@ def post_login(request):
 @has_permission(["can_view_orgusers"])
 def get_organization_users(request):
     """list all OrgUsers in the requestor's org, including inactive"""
-    orguser: OrgUser = request.orguser
-    if orguser.org is None:
-        raise HttpError(400, "no associated org")
-    org: Org = orguser.org
+    org: Org = request.org
     # warehouse
     warehouse = OrgWarehouse.objects.filter(org=org).first()
 
     res = []
-    for curr_orguser in OrgUser.objects.filter(org=org).prefetch_related(
-        Prefetch(
-            "new_role",
-            queryset=Role.objects.prefetch_related(
-                Prefetch(
-                    "rolepermissions",
-                    queryset=RolePermission.objects.filter(role_id=F("role__id")).select_related(
-                        "permission"
-                    ),
-                )
-            ),
-        ),
-        Prefetch(
-            "org",
-            queryset=Org.objects.prefetch_related(
-                "orgtncs",  # Assuming 'orgtnc' is a related name from Org to its related model
+    for curr_orguser in (
+        OrgUser.objects.filter(org=org)
+        .select_related("user", "org", "org__org_plans")
+        .prefetch_related(
+            Prefetch(
+                "new_role",
+                queryset=Role.objects.prefetch_related(
+                    Prefetch(
+                        "rolepermissions",
+                        queryset=RolePermission.objects.filter(
+                            role_id=F("role__id")
+                        ).select_related("permission"),
+                    )
+                ),
             ),
-        ),
-        Prefetch(
-            "user",
-            queryset=User.objects.all(),
-        ),
+            "org__orgtncs",
+        )
     ):
         if curr_orguser.org.orgtncs.exists():
             curr_orguser.org.tnc_accepted = curr_orguser.org.orgtncs.exists()
         res.append(
-            OrgUserResponse(
+            OrgUserResponse.construct(
                 email=curr_orguser.user.email,
-                org=curr_orguser.org,
+                org=OrgSchema.from_orm(curr_orguser.org),
                 active=curr_orguser.user.is_active,
                 role=curr_orguser.role,
                 role_slug=slugify(OrgUserRole(curr_orguser.role).name),
@@ -210,9 +198,6 @@ def get_organization_users(request):
 def delete_organization_users(request, payload: DeleteOrgUserPayload):
     """delete the orguser posted"""
     orguser: OrgUser = request.orguser
-    if orguser.org is None:
-        raise HttpError(400, "no associated org")
-
     _, error = orguserfunctions.delete_orguser(orguser, payload)
     if error:
         raise HttpError(400, error)
@@ -225,9 +210,6 @@ def delete_organization_users(request, payload: DeleteOrgUserPayload):
 def delete_organization_users_v1(request, payload: DeleteOrgUserPayload):
     """delete the orguser posted"""
     orguser: OrgUser = request.orguser
-    if orguser.org is None:
-        raise HttpError(400, "no associated org")
-
     _, error = orguserfunctions.delete_orguser_v1(orguser, payload)
     if error:
         raise HttpError(400, error)
@@ -282,9 +264,11 @@ def put_organization_user(request, payload: OrgUserUpdate):
     ]:
         raise HttpError(400, "not authorized to update another user")
 
-    orguser = OrgUser.objects.filter(
-        user__email=payload.toupdate_email, org=request.orguser.org
-    ).first()
+    orguser = (
+        OrgUser.objects.filter(user__email=payload.toupdate_email, org=request.orguser.org)
+        .select_related("user", "org", "new_role")
+        .first()
+    )
     if orguser is None:
         raise HttpError(400, "could not find user having this email address in this org")
 
@@ -301,9 +285,11 @@ def put_organization_user_v1(request, payload: OrgUserUpdatev1):
     """update another OrgUser or themselves"""
     requestor_orguser: OrgUser = request.orguser
 
-    orguser = OrgUser.objects.filter(
-        user__email=payload.toupdate_email, org=request.orguser.org
-    ).first()
+    orguser = (
+        OrgUser.objects.filter(user__email=payload.toupdate_email, org=request.orguser.org)
+        .select_related("user", "org", "new_role")
+        .first()
+    )
     if orguser is None:
         raise HttpError(400, "could not find user having this email address in this org")
 
@@ -354,9 +340,8 @@ def post_modify_orguser_role(request, payload: OrgUserUpdateNewRole):
     if role_to_be_assgined.level > orguser.new_role.level:
         raise HttpError(403, "Insufficient permissions")
 
-    request_email = payload.toupdate_email.lower().strip()
     orguser_to_be_assigned = (
-        OrgUser.objects.filter(user__email__iexact=request_email, org=orguser.org)
+        OrgUser.objects.filter(user__email__iexact=payload.toupdate_email, org=orguser.org)
         .exclude(user__email__iexact=orguser.user.email)
         .first()
     )
@@ -374,11 +359,14 @@ def post_modify_orguser_role(request, payload: OrgUserUpdateNewRole):
 def post_organization_warehouse(request, payload: OrgWarehouseSchema):
     """registers a data warehouse for the org"""
     orguser: OrgUser = request.orguser
-    _, error = airbytehelpers.create_warehouse(orguser.org, payload)
+    warehouse, error = airbytehelpers.create_warehouse(orguser.org, payload)
     if error:
         raise HttpError(400, error)
 
-    return {"success": 1}
+    # the airbyte destination is created in the background and recorded on the warehouse
+    transaction.on_commit(lambda: create_airbyte_destination.delay(warehouse.id, orguser.id))
+
+    return {"success": 1, "warehouse_id": warehouse.id}
 
 
 @user_org_router.get("/organizations/warehouses", auth=auth.CustomAuthMiddleware())
@@ -528,10 +516,6 @@ def get_invitations_v1(request):
 @has_permission(["can_edit_invitation"])
 def post_resend_invitation(request, invitation_id):
     """Get all invitations sent by the current user"""
-    orguser: OrgUser = request.orguser
-    if orguser.org is None:
-        raise HttpError(400, "create an organization first")
-
     _, error = orguserfunctions.resend_invitation(invitation_id)
     if error:
         raise HttpError(400, error)
@@ -545,14 +529,7 @@ def post_resend_invitation(request, invitation_id):
 @has_permission(["can_delete_invitation"])
 def delete_invitation(request, invitation_id):
     """Get all invitations sent by the current user"""
-    orguser: OrgUser = request.orguser
-    if orguser.org is None:
-        raise HttpError(400, "create an organization first")
-
-    invitation = Invitation.objects.filter(id=invitation_id).first()
-
-    if invitation:
-        invitation.delete()
+    Invitation.objects.filter(id=invitation_id).delete()
 
     return {"success": 1}
 
@@ -568,8 +545,12 @@ def post_organization_v1(request, payload: CreateOrgSchema):
     """creates a new org & new orguser (if required) and attaches it to the requestor"""
     orguser: OrgUser = request.orguser
 
-    userattributes = UserAttributes.objects.filter(user=orguser.user).first()
-    if userattributes is None or userattributes.can_create_orgs is False:
+    can_create_orgs = (
+        UserAttributes.objects.filter(user=orguser.user)
+        .values_list("can_create_orgs", flat=True)
+        .first()
+    )
+    if not can_create_orgs:
         raise HttpError(403, "Insufficient permissions for this operation")
 
     org, error = orgfunctions.create_organization(payload)
@@ -592,14 +573,11 @@ def post_organization_v1(request, payload: CreateOrgSchema):
 @has_permission(["can_delete_warehouses"])
 def delete_organization_warehouses_v1(request):
     """deletes all (references to) data warehouses for the org"""
-    orguser: OrgUser = request.orguser
-    if orguser.org is None:
-        raise HttpError(400, "create an organization first")
-
-    if orguser.org.base_plan() == OrgType.DEMO:
+    org: Org = request.org
+    if org.base_plan() == OrgType.DEMO:
         raise HttpError(403, "insufficient permissions")
 
-    delete_warehouse_v1(orguser.org)
+    delete_warehouse_v1(org)
 
     return {"success": 1}
 
@@ -625,11 +603,7 @@ def get_organization_feature_flags(request):
 @user_org_router.get("/organizations/wren", auth=auth.CustomAuthMiddleware())
 def get_organization_wren(request):
     """Fetch org_wren from the database and send to frontend"""
-    orguser: OrgUser = request.orguser
-    if orguser.org is None:
-        raise HttpError(400, "no associated org")
-
-    org_wren = OrgWren.objects.filter(org=orguser.org).first()
+    org_wren = OrgWren.objects.filter(org=request.org).first()
     if org_wren is None:
         raise HttpError(404, "org_wren not found")
 
@@ -19,6 +19,9 @@ from channels.auth import AuthMiddlewareStack
 from channels.routing import ProtocolTypeRouter, URLRouter, ChannelNameRouter
 from channels.security.websocket import AllowedHostsOriginValidator
 from ddpui.urls import ws_urlpatterns
+from ddpui.routes import warm_api
+
+warm_api()
 
 
 application = ProtocolTypeRouter(
@@ -38,7 +38,7 @@ class PlatformAdmin(HttpBearer):
     """
 
     def authenticate(self, request, token):
-        tokenrecord = Token.objects.filter(key=token).first()
+        tokenrecord = Token.objects.filter(key=token).select_related("user").first()
         if tokenrecord and tokenrecord.user:
             request.user = tokenrecord.user
             adminuser = AdminUser.objects.filter(user=request.user).first()
@@ -74,35 +74,39 @@ def has_permission(permission_slugs: list):
 
 def authenticate_org_user(request, token, allowed_roles, require_org):
     """docstring"""
-    tokenrecord = Token.objects.filter(key=token).first()
+    tokenrecord = Token.objects.filter(key=token).select_related("user").first()
     if tokenrecord and tokenrecord.user:
         request.user = tokenrecord.user
         q_orguser = OrgUser.objects.filter(user=request.user)
         if request.headers.get("x-dalgo-org"):
             orgslug = request.headers["x-dalgo-org"]
             q_orguser = q_orguser.filter(org__slug=orgslug)
-        orguser = q_orguser.first()
+        orguser = q_orguser.select_related("org", "user").first()
         if orguser is not None:
             if require_org and orguser.org is None:
                 raise HttpError(400, "register an organization first")
             if orguser.role in allowed_roles:
                 request.orguser = orguser
+                request.org = orguser.org
                 return request
     raise HttpError(400, UNAUTHORIZED)
 
 
 class CustomAuthMiddleware(HttpBearer):
-    """new middleware that works based on permissions from db"""
+    """
+    new middleware that works based on permissions from db
+    rejects users without an org, so views behind it can rely on request.org
+    """
 
     def authenticate(self, request, token):
-        tokenrecord = Token.objects.filter(key=token).first()
+        tokenrecord = Token.objects.filter(key=token).select_related("user").first()
         if tokenrecord and tokenrecord.user:
             request.user = tokenrecord.user
             q_orguser = OrgUser.objects.filter(user=request.user)
             if request.headers.get("x-dalgo-org"):
                 orgslug = request.headers["x-dalgo-org"]
                 q_orguser = q_orguser.filter(org__slug=orgslug)
-            orguser = q_orguser.select_related("org", "user").first()
+            orguser = q_orguser.select_related("org", "user", "new_role").first()
             if orguser is not None:
                 if orguser.org is None:
                     raise HttpError(400, "register an organization first")
@@ -113,6 +117,7 @@ class CustomAuthMiddleware(HttpBearer):
 
                 request.permissions = list(permission_slugs) or []
                 request.orguser = orguser
+                request.org = orguser.org
                 thread.set_current_request(request)
                 return request
 
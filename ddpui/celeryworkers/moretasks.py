@@ -4,7 +4,7 @@ from ddpui.models.notifications import Notification
 from ddpui.models.org_user import OrgUser
 from ddpui.models.userpreferences import UserPreferences
 from ddpui.utils.awsses import send_text_message
-from ddpui.utils import timezone
+from ddpui.utils import sendgrid, timezone
 from ddpui.utils.custom_logger import CustomLogger
 
 logger = CustomLogger("ddpui")
@@ -27,3 +27,38 @@ def schedule_notification_task(self, notification_id, recipient_id):  # skipcq:
             )
         except Exception as e:
             logger.error(f"Error sending discord notification: {str(e)}")
+
+
+# the emails below are sent from the worker so that the api request doesn't wait on sendgrid
+# the user has already been told the email is on its way, so sendgrid failures are retried
+EMAIL_TASK_OPTIONS = {"autoretry_for": (Exception,), "retry_backoff": True, "max_retries": 5}
+
+
+@app.task(**EMAIL_TASK_OPTIONS)
+def send_signup_email_task(to_email: str, verification_url: str):
+    """send the email verification link to a new or unverified user"""
+    sendgrid.send_signup_email(to_email, verification_url)
+
+
+@app.task(**EMAIL_TASK_OPTIONS)
+def send_password_reset_email_task(to_email: str, reset_url: str):
+    """send the password reset link"""
+    sendgrid.send_password_reset_email(to_email, reset_url)
+
+
+@app.task(**EMAIL_TASK_OPTIONS)
+def send_invite_user_email_task(to_email: str, invited_by_email: str, invite_url: str):
+    """send an invitation to join an org"""
+    sendgrid.send_invite_user_email(to_email, invited_by_email, invite_url)
+
+
+@app.task(**EMAIL_TASK_OPTIONS)
+def send_youve_been_added_email_task(to_email: str, added_by: str, org_name: str):
+    """let an existing user know they have been added to another org"""
+    sendgrid.send_youve_been_added_email(to_email, added_by, org_name)
+
+
+@app.task(**EMAIL_TASK_OPTIONS)
+def send_demo_account_post_verify_email_task(to_email: str):
+    """send the demo account details once the email has been verified"""
+    sendgrid.send_demo_account_post_verify_email(to_email)
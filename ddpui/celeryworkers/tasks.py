@@ -10,7 +10,9 @@ import pytz
 import yaml
 from celery.schedules import crontab
 from django.utils.text import slugify
+from ddpui import settings
 from ddpui.auth import ACCOUNT_MANAGER_ROLE
+from ninja.errors import HttpError
 from ddpui.celery import app, Celery
 
 
@@ -70,9 +72,11 @@ from ddpui.ddpprefect.prefect_service import (
     get_long_running_flow_runs,
     compute_dataflow_run_times_from_history,
 )
-from ddpui.ddpprefect import DBTCLIPROFILE
+from ddpui.ddpprefect import DBTCLIPROFILE, AIRBYTESERVER
 from ddpui.datainsights.warehouse.warehouse_factory import WarehouseFactory
 from ddpui.core import llm_service
+from ddpui.core.notifications_service import create_notification
+from ddpui.schemas.notifications_api_schemas import NotificationDataSchema
 from ddpui.utils.helpers import (
     convert_sqlalchemy_rows_to_csv_string,
 )
@@ -611,6 +615,94 @@ def sync_flow_runs_of_deployments(deployment_ids: list[str] = None, look_back_ho
             continue
 
 
+@app.task(bind=True, autoretry_for=(Exception,), retry_backoff=True, max_retries=5)
+def setup_airbyte_workspace_for_org(self, org_id: int):
+    """
+    creates the airbyte workspace for a newly created org
+    and adds our custom sources to it
+    the org's managers are notified if it still fails after the last retry
+    """
+    org = Org.objects.filter(id=org_id).first()
+    if org is None:
+        logger.error("org %s not found, not creating an airbyte workspace", org_id)
+        return
+
+    try:
+        if org.airbyte_workspace_id is None:
+            workspace_id = airbytehelpers.setup_airbyte_workspace_v1(org.slug, org).workspaceId
+        elif OrgPrefectBlockv1.objects.filter(org=org, block_type=AIRBYTESERVER).exists():
+            logger.info("org %s already has an airbyte workspace", org.slug)
+            return
+        else:
+            # an earlier attempt created the workspace but not the prefect server block
+            airbytehelpers.ensure_airbyte_server_block(org)
+            workspace_id = org.airbyte_workspace_id
+    except Exception as err:
+        logger.error("could not set up airbyte workspace for org %s: %s", org.slug, str(err))
+        if self.request.retries >= self.max_retries:
+            notify_org_managers(
+                org,
+                f"We could not finish setting up {org.name}. Please contact support.",
+                f"{org.name}: setup failed",
+            )
+        raise
+
+    add_custom_connectors_to_workspace.delay(
+        workspace_id, list(settings.AIRBYTE_CUSTOM_SOURCES.values())
+    )
+
+
+@app.task(bind=True, autoretry_for=(Exception,), retry_backoff=True, max_retries=5)
+def create_airbyte_destination(self, warehouse_id: int, orguser_id: int):
+    """
+    creates the airbyte destination for a newly registered warehouse
+    if airbyte rejects the config or keeps failing, the warehouse is removed
+    so that it can be registered again, and the requestor is notified
+    """
+    warehouse = OrgWarehouse.objects.filter(id=warehouse_id).select_related("org").first()
+    if warehouse is None:
+        logger.error("warehouse %s not found, not creating an airbyte destination", warehouse_id)
+        return
+
+    if warehouse.airbyte_destination_id is not None:
+        logger.info("warehouse %s already has an airbyte destination", warehouse_id)
+        return
+
+    try:
+        _, error = airbytehelpers.create_warehouse_destination(warehouse)
+    except Exception as err:
+        # a 4xx from airbyte will not go away by retrying
+        rejected = isinstance(err, HttpError) and err.status_code < 500
+        if not rejected and self.request.retries < self.max_retries:
+            logger.info(
+                "could not create airbyte destination for warehouse %s, retrying: %s",
+                warehouse_id,
+                str(err),
+            )
+            raise
+        error = str(err)
+
+    if error:
+        logger.error(
+            "could not create airbyte destination for warehouse %s, removing it: %s",
+            warehouse_id,
+            error,
+        )
+        airbytehelpers.delete_unregistered_warehouse(warehouse)
+
+        org = warehouse.org
+        notification_error, _ = create_notification(
+            NotificationDataSchema(
+                author="Dalgo",
+                message=f"We could not set up the {warehouse.wtype} warehouse for {org.name}: {error}. Please check the configuration and add it again.",
+                email_subject=f"{org.name}: warehouse setup failed",
+                recipients=[orguser_id],
+            )
+        )
+        if notification_error:
+            logger.error(f"Error creating notification: {notification_error}")
+
+
 @app.task(bind=True)
 def add_custom_connectors_to_workspace(self, workspace_id, custom_sources: list[dict]):
     """
@@ -1,45 +1,32 @@
 """functions for working with Orgs"""
 
+from django.db import transaction
 from django.utils.text import slugify
 
-from ddpui.ddpairbyte import airbytehelpers
 from ddpui.utils.custom_logger import CustomLogger
-from ddpui import settings
 from ddpui.models.org import (
     Org,
     CreateOrgSchema,
 )
 from ddpui.utils.constants import DALGO_WITH_SUPERSET, DALGO, FREE_TRIAL, ORG_BASE_PLANS
 from ddpui.models.org_plans import OrgPlans
-from ddpui.celeryworkers.tasks import add_custom_connectors_to_workspace
+from ddpui.celeryworkers.tasks import setup_airbyte_workspace_for_org
 
 logger = CustomLogger("ddpui")
 
 
 def create_organization(payload: CreateOrgSchema):
-    """creates a new Org"""
-    org = Org.objects.filter(name__iexact=payload.name).first()
-    if org:
+    """
+    creates a new Org
+    the airbyte workspace is set up by a celery task once the org has been committed
+    """
+    if Org.objects.filter(name__iexact=payload.name).exists():
         return None, "client org with this name already exists"
 
-    org = Org(name=payload.name)
-    org.slug = slugify(org.name)[:20]
+    org = Org(name=payload.name, slug=slugify(payload.name)[:20])
     org.save()
 
-    try:
-        workspace = airbytehelpers.setup_airbyte_workspace_v1(org.slug, org)
-        # add custom sources to this workspace
-        add_custom_connectors_to_workspace.delay(
-            workspace.workspaceId, list(settings.AIRBYTE_CUSTOM_SOURCES.values())
-        )
-
-    except Exception as err:
-        logger.error("could not create airbyte workspace: " + str(err))
-        # delete the org or we won't be able to create it once airbyte comes back up
-        org.delete()
-        return None, "could not create airbyte workspace"
-
-    org.refresh_from_db()
+    transaction.on_commit(lambda: setup_airbyte_workspace_for_org.delay(org.id))
 
     return org, None
 
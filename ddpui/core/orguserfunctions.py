@@ -4,7 +4,6 @@ do not raise http errors here
 """
 
 import os
-from datetime import datetime
 from uuid import uuid4
 
 from django.contrib.auth.models import User
@@ -13,6 +12,13 @@ from django.utils.text import slugify
 from django.utils import timezone as django_timezone
 
 from ddpui.auth import ACCOUNT_MANAGER_ROLE, GUEST_ROLE
+from ddpui.celeryworkers.moretasks import (
+    send_demo_account_post_verify_email_task,
+    send_invite_user_email_task,
+    send_password_reset_email_task,
+    send_signup_email_task,
+    send_youve_been_added_email_task,
+)
 from ddpui.models.org import Org, OrgType
 from ddpui.models.org_user import (
     AcceptInvitationSchema,
@@ -34,7 +40,7 @@ from ddpui.models.org_user import (
 from ddpui.models.userpreferences import UserPreferences
 from ddpui.models.orgtnc import OrgTnC
 from ddpui.models.role_based_access import Role
-from ddpui.utils import helpers, sendgrid, timezone
+from ddpui.utils import helpers
 from ddpui.utils.custom_logger import CustomLogger
 from ddpui.utils.orguserhelpers import from_invitation, from_orguser
 from ddpui.utils.redis_client import RedisClient
@@ -125,7 +131,7 @@ def signup_orguser(payload: OrgUserCreate):
     FRONTEND_URL = os.getenv("FRONTEND_URL")
     reset_url = f"{FRONTEND_URL}/verifyemail/?token={token.hex}"
     try:
-        sendgrid.send_signup_email(payload.email, reset_url)
+        send_signup_email_task.delay(payload.email, reset_url)
     except Exception:
         return None, "failed to send email"
 
@@ -278,7 +284,7 @@ def invite_user(orguser: OrgUser, payload: InvitationSchema):
         OrgUser.objects.create(
             user=existing_user, org=orguser.org, role=invited_role, new_role=new_role
         )
-        sendgrid.send_youve_been_added_email(invited_email, orguser.user.email, orguser.org.name)
+        send_youve_been_added_email_task.delay(invited_email, orguser.user.email, orguser.org.name)
         return (
             InvitationSchema(
                 invited_email=invited_email,
@@ -291,10 +297,10 @@ def invite_user(orguser: OrgUser, payload: InvitationSchema):
         invited_email__iexact=invited_email, invited_by__org=orguser.org
     ).first()
     if invitation:
-        invitation.invited_on = timezone.as_utc(datetime.utcnow())
+        invitation.invited_on = django_timezone.now()
         # if the invitation is already present - trigger the email again
         invite_url = f"{frontend_url}/invitations/?invite_code={invitation.invite_code}"
-        sendgrid.send_invite_user_email(
+        send_invite_user_email_task.delay(
             invitation.invited_email, invitation.invited_by.user.email, invite_url
         )
         logger.info(
@@ -304,7 +310,7 @@ def invite_user(orguser: OrgUser, payload: InvitationSchema):
         return from_invitation(invitation), None
 
     payload.invited_by = from_orguser(orguser)
-    payload.invited_on = timezone.as_utc(datetime.utcnow())
+    payload.invited_on = django_timezone.now()
     payload.invite_code = str(uuid4())
 
     invitation = Invitation.objects.create(
@@ -318,7 +324,7 @@ def invite_user(orguser: OrgUser, payload: InvitationSchema):
 
     # trigger an email to the user
     invite_url = f"{frontend_url}/invitations/?invite_code={payload.invite_code}"
-    sendgrid.send_invite_user_email(
+    send_invite_user_email_task.delay(
         invitation.invited_email, invitation.invited_by.user.email, invite_url
     )
 
@@ -353,7 +359,7 @@ def invite_user_v1(orguser: OrgUser, payload: NewInvitationSchema):
     if existing_user:
         logger.info("user exists, creating new OrgUser")
         OrgUser.objects.create(user=existing_user, org=orguser.org, new_role=invited_role)
-        sendgrid.send_youve_been_added_email(invited_email, orguser.user.email, orguser.org.name)
+        send_youve_been_added_email_task.delay(invited_email, orguser.user.email, orguser.org.name)
         return (
             NewInvitationSchema(
                 invited_email=invited_email,
@@ -366,10 +372,10 @@ def invite_user_v1(orguser: OrgUser, payload: NewInvitationSchema):
         invited_email__iexact=invited_email, invited_by__org=orguser.org
     ).first()
     if invitation:
-        invitation.invited_on = timezone.as_utc(datetime.utcnow())
+        invitation.invited_on = django_timezone.now()
         # if the invitation is already present - trigger the email again
         invite_url = f"{frontend_url}/invitations/?invite_code={invitation.invite_code}"
-        sendgrid.send_invite_user_email(
+        send_invite_user_email_task.delay(
             invitation.invited_email, invitation.invited_by.user.email, invite_url
         )
         logger.info(
@@ -385,14 +391,14 @@ def invite_user_v1(orguser: OrgUser, payload: NewInvitationSchema):
     invitation = Invitation.objects.create(
         invited_email=invited_email,
         invited_by=orguser,
-        invited_on=datetime.now(timezone.UTC),
+        invited_on=django_timezone.now(),
         invite_code=str(uuid4()),
         invited_new_role=invited_role,
     )
 
     # trigger an email to the user
     invite_url = f"{frontend_url}/invitations/?invite_code={invitation.invite_code}"
-    sendgrid.send_invite_user_email(
+    send_invite_user_email_task.delay(
         invitation.invited_email, invitation.invited_by.user.email, invite_url
     )
 
@@ -531,12 +537,12 @@ def resend_invitation(invitation_id: str):
     invitation = Invitation.objects.filter(id=invitation_id).first()
 
     if invitation:
-        invitation.invited_on = timezone.as_utc(datetime.utcnow())
+        invitation.invited_on = django_timezone.now()
         invitation.save()
         # trigger an email to the user
         frontend_url = os.getenv("FRONTEND_URL")
         invite_url = f"{frontend_url}/invitations/?invite_code={invitation.invite_code}"
-        sendgrid.send_invite_user_email(
+        send_invite_user_email_task.delay(
             invitation.invited_email, invitation.invited_by.user.email, invite_url
         )
 
@@ -564,7 +570,7 @@ def request_reset_password(email: str):
     FRONTEND_URL = os.getenv("FRONTEND_URL")
     reset_url = f"{FRONTEND_URL}/resetpassword/?token={token.hex}"
     try:
-        sendgrid.send_password_reset_email(email, reset_url)
+        send_password_reset_email_task.delay(email, reset_url)
     except Exception:
         return None, "failed to send email"
 
@@ -617,7 +623,7 @@ def resend_verification_email(orguser: OrgUser, email: str):
     FRONTEND_URL = os.getenv("FRONTEND_URL")
     reset_url = f"{FRONTEND_URL}/verifyemail/?token={token.hex}"
     try:
-        sendgrid.send_signup_email(email, reset_url)
+        send_signup_email_task.delay(email, reset_url)
     except Exception:
         return None, "failed to send email"
 
@@ -649,7 +655,7 @@ def verify_email(payload: VerifyEmailSchema):
 
     if orguser.org.base_plan() == OrgType.DEMO:
         try:
-            sendgrid.send_demo_account_post_verify_email(orguser.user.email)
+            send_demo_account_post_verify_email_task.delay(orguser.user.email)
         except Exception:
             return None, "failed to send email"
 
@@ -663,7 +669,7 @@ def ensure_orguser_for_org(orguser: OrgUser, org):
     """
     if orguser.org is None:
         orguser.org = org
-        orguser.save()
+        orguser.save(update_fields=["org", "updated_at"])
     else:
         OrgUser.objects.create(
             user=orguser.user,
@@ -680,13 +686,19 @@ def accept_tnc(orguser: OrgUser):
     if orguser.org is None:
         return None, "create an organization first"
 
-    userattributes = UserAttributes.objects.filter(user=orguser.user).first()
-    if userattributes and userattributes.is_consultant:
+    is_consultant = (
+        UserAttributes.objects.filter(user=orguser.user)
+        .values_list("is_consultant", flat=True)
+        .first()
+    )
+    if is_consultant:
         return None, "user cannot accept tnc"
 
-    if OrgTnC.objects.filter(org=orguser.org).exists():
+    _, created = OrgTnC.objects.get_or_create(
+        org=orguser.org,
+        defaults={"tnc_accepted_by": orguser, "tnc_accepted_on": django_timezone.now()},
+    )
+    if not created:
         return None, "tnc already accepted"
 
-    OrgTnC.objects.create(org=orguser.org, tnc_accepted_by=orguser, tnc_accepted_on=datetime.now())
-
     return None, None
@@ -6,6 +6,7 @@ These functions do not access the Dalgo database
 
 from typing import Dict, List
 import os
+import json
 from datetime import datetime
 import requests
 from dotenv import load_dotenv
@@ -25,6 +26,7 @@ from ddpui.ddpairbyte.schema import (
     AirbyteDestinationUpdateCheckConnection,
 )
 from ddpui.utils import thread
+from ddpui.utils.redis_client import RedisClient
 from ddpui.models.org import OrgPrefectBlockv1
 
 load_dotenv()
@@ -32,26 +34,33 @@ load_dotenv()
 
 logger = CustomLogger("airbyte")
 
+# destination configs rarely change, so we keep them in redis for a few minutes
+DESTINATION_CACHE_EXPIRY = 300  # seconds
 
-def abreq(endpoint, req=None, **kwargs):
-    """Request to the airbyte server"""
+
+def abreq(endpoint, req=None, org: Org = None, **kwargs):
+    """
+    Request to the airbyte server
+    the org is taken from the current request unless it is passed in, e.g. from a celery task
+    """
     method = kwargs.get("method", "POST")
     if method not in ["GET", "POST"]:
         raise HttpError(500, "method not supported")
 
-    request = thread.get_current_request()
+    if org is None:
+        request = thread.get_current_request()
+        if request is not None:
+            org = request.orguser.org
 
     abhost = os.getenv("AIRBYTE_SERVER_HOST")
     abport = os.getenv("AIRBYTE_SERVER_PORT")
     abver = os.getenv("AIRBYTE_SERVER_APIVER")
     token = os.getenv("AIRBYTE_API_TOKEN")
 
-    if request is not None:
-        org_user = request.orguser
-        org_slug = org_user.org.slug
-        if flag_enabled("AIRBYTE_PROFILE", request_org_slug=org_slug):
+    if org is not None:
+        if flag_enabled("AIRBYTE_PROFILE", request_org_slug=org.slug):
             org_server_block = OrgPrefectBlockv1.objects.filter(
-                org=org_user.org, block_type=AIRBYTESERVER
+                org=org, block_type=AIRBYTESERVER
             ).first()
 
             if not org_server_block:
@@ -510,7 +519,7 @@ def get_destination_definitions(workspace_id: str) -> dict:
     return res
 
 
-def get_destination_definition(workspace_id: str, destinationdef_id: str) -> dict:
+def get_destination_definition(workspace_id: str, destinationdef_id: str, org: Org = None) -> dict:
     """get the destination definition"""
     if not isinstance(workspace_id, str):
         raise HttpError(400, "workspace_id must be a string")
@@ -520,6 +529,7 @@ def get_destination_definition(workspace_id: str, destinationdef_id: str) -> dic
     res = abreq(
         "destination_definitions/get",
         {"destinationDefinitionId": destinationdef_id},
+        org=org,
     )
     if "destinationDefinitionId" not in res:
         logger.error("Destination definition not found for workspace: %s", workspace_id)
@@ -577,15 +587,37 @@ def get_destination(workspace_id: str, destination_id: str) -> dict:
     return res
 
 
+def get_destination_cached(workspace_id: str, destination_id: str) -> dict:
+    """Fetch a destination in an airbyte workspace, serving repeat lookups from redis"""
+    redis = RedisClient.get_instance()
+    redis_key = f"airbyte-destination:{destination_id}"
+    cached_destination = redis.get(redis_key)
+    if cached_destination is not None:
+        return json.loads(cached_destination)
+
+    res = get_destination(workspace_id, destination_id)
+    redis.set(redis_key, json.dumps(res), ex=DESTINATION_CACHE_EXPIRY)
+    return res
+
+
+def clear_cached_destination(destination_id: str) -> None:
+    """Drop a destination from the cache used by get_destination_cached"""
+    redis = RedisClient.get_instance()
+    redis.delete(f"airbyte-destination:{destination_id}")
+
+
 def delete_destination(
     workspace_id: str, destination_id: str  # skipcq PYL-W0613
 ) -> dict:  # pylint: disable=unused-argument
     """Fetch a destination in an airbyte workspace"""
     res = abreq("destinations/delete", {"destinationId": destination_id})
+    clear_cached_destination(destination_id)
     return res
 
 
-def create_destination(workspace_id: str, name: str, destinationdef_id: str, config: dict) -> dict:
+def create_destination(
+    workspace_id: str, name: str, destinationdef_id: str, config: dict, org: Org = None
+) -> dict:
     """Create destination in an airbyte workspace"""
     if not isinstance(workspace_id, str):
         raise HttpError(400, "workspace_id must be a string")
@@ -604,6 +636,7 @@ def create_destination(workspace_id: str, name: str, destinationdef_id: str, con
             "destinationDefinitionId": destinationdef_id,
             "connectionConfiguration": config,
         },
+        org=org,
     )
     if "destinationId" not in res:
         logger.error("Failed to create destination: %s", res)
@@ -636,6 +669,7 @@ def update_destination(
     if "destinationId" not in res:
         logger.error("Failed to update destination: %s", res)
         raise HttpError(500, "failed to update destination")
+    clear_cached_destination(destination_id)
     return res
 
 
@@ -11,6 +11,7 @@ from datetime import datetime
 import yaml
 from ninja.errors import HttpError
 from django.utils.text import slugify
+from django.utils import timezone as django_timezone
 from django.conf import settings
 from django.db import transaction
 from django.db.models import F, Window, Q
@@ -152,8 +153,19 @@ def setup_airbyte_workspace_v1(wsname: str, org: Org) -> AirbyteWorkspace:
     workspace = airbyte_service.create_workspace(wsname)
 
     org.airbyte_workspace_id = workspace["workspaceId"]
-    org.save()
+    org.save(update_fields=["airbyte_workspace_id", "updated_at"])
 
+    ensure_airbyte_server_block(org)
+
+    return AirbyteWorkspace(
+        name=workspace["name"],
+        workspaceId=workspace["workspaceId"],
+        initialSetupComplete=workspace["initialSetupComplete"],
+    )
+
+
+def ensure_airbyte_server_block(org: Org):
+    """creates the org's airbyte server block in prefect and in our db if they don't exist"""
     # Airbyte server block details. prefect doesn't know the workspace id
     block_name = f"{org.slug}-{slugify(AIRBYTESERVER)}"
 
@@ -183,12 +195,6 @@ def setup_airbyte_workspace_v1(wsname: str, org: Org) -> AirbyteWorkspace:
             prefect_service.delete_airbyte_server_block(airbyte_server_block_id)
             raise Exception("could not create orgprefectblock for airbyte-server") from error
 
-    return AirbyteWorkspace(
-        name=workspace["name"],
-        workspaceId=workspace["workspaceId"],
-        initialSetupComplete=workspace["initialSetupComplete"],
-    )
-
 
 def create_airbyte_deployment(org: Org, org_task: OrgTask, server_block: OrgPrefectBlockv1):
     """Creates OrgDataFlowv1 & the prefect deployment based on the airbyte OrgTask"""
@@ -825,7 +831,7 @@ def update_destination(org: Org, destination_id: str, payload: AirbyteDestinatio
 
     if warehouse.name != payload.name:
         warehouse.name = payload.name
-        warehouse.save()
+        warehouse.save(update_fields=["name", "updated_at"])
 
     dbt_credentials = {}
     if warehouse.wtype == "postgres":
@@ -886,66 +892,151 @@ def update_destination(org: Org, destination_id: str, payload: AirbyteDestinatio
     return destination, None
 
 
+# maps a warehouse type to a function which pulls the dbt credentials out of the airbyte config
+#
+# postgres:
+#   host, database, port, username, password
+#   jdbc_url_params
+#   ssl: true | false
+#   ssl_mode:
+#     mode: disable | allow | prefer | require | verify-ca | verify-full
+#     ca_certificate: string if mode is require, verify-ca, or verify-full
+#     client_key_password: string if mode is verify-full
+#   tunnel_method:
+#     tunnel_method = NO_TUNNEL | SSH_KEY_AUTH | SSH_PASSWORD_AUTH
+#     tunnel_host: string if SSH_KEY_AUTH | SSH_PASSWORD_AUTH
+#     tunnel_port: int if SSH_KEY_AUTH | SSH_PASSWORD_AUTH
+#     tunnel_user: string if SSH_KEY_AUTH | SSH_PASSWORD_AUTH
+#     ssh_key: string if SSH_KEY_AUTH
+#     tunnel_user_password: string if SSH_PASSWORD_AUTH
+WAREHOUSE_DBT_CREDENTIALS_BUILDERS = {
+    "postgres": lambda airbyte_config: airbyte_config,
+    "bigquery": lambda airbyte_config: json.loads(airbyte_config["credentials_json"]),
+    "snowflake": lambda airbyte_config: airbyte_config,
+}
+
+
 def create_warehouse(org: Org, payload: OrgWarehouseSchema):
-    """creates a warehouse for an org"""
+    """
+    registers a warehouse for an org
+    its airbyte destination is created afterwards by create_warehouse_destination
+    """
 
-    if payload.wtype not in ["postgres", "bigquery", "snowflake"]:
+    if payload.wtype not in WAREHOUSE_DBT_CREDENTIALS_BUILDERS:
         return None, "unrecognized warehouse type " + payload.wtype
 
-    destination = airbyte_service.create_destination(
-        org.airbyte_workspace_id,
-        f"{payload.wtype}-warehouse",
-        payload.destinationDefId,
-        payload.airbyteConfig,
-    )
-    logger.info("created destination having id " + destination["destinationId"])
+    if org.airbyte_workspace_id is None:
+        # the workspace for a new org is set up by setup_airbyte_workspace_for_org
+        return (
+            None,
+            "the airbyte workspace for this org is still being set up, please try again shortly",
+        )
 
     # prepare the dbt credentials from airbyteConfig
-    dbt_credentials = None
-    if payload.wtype == "postgres":
-        # host, database, port, username, password
-        # jdbc_url_params
-        # ssl: true | false
-        # ssl_mode:
-        #   mode: disable | allow | prefer | require | verify-ca | verify-full
-        #   ca_certificate: string if mode is require, verify-ca, or verify-full
-        #   client_key_password: string if mode is verify-full
-        # tunnel_method:
-        #   tunnel_method = NO_TUNNEL | SSH_KEY_AUTH | SSH_PASSWORD_AUTH
-        #   tunnel_host: string if SSH_KEY_AUTH | SSH_PASSWORD_AUTH
-        #   tunnel_port: int if SSH_KEY_AUTH | SSH_PASSWORD_AUTH
-        #   tunnel_user: string if SSH_KEY_AUTH | SSH_PASSWORD_AUTH
-        #   ssh_key: string if SSH_KEY_AUTH
-        #   tunnel_user_password: string if SSH_PASSWORD_AUTH
-        dbt_credentials = payload.airbyteConfig
-    elif payload.wtype == "bigquery":
-        credentials_json = json.loads(payload.airbyteConfig["credentials_json"])
-        dbt_credentials = credentials_json
-    elif payload.wtype == "snowflake":
-        dbt_credentials = payload.airbyteConfig
-
-    destination_definition = airbyte_service.get_destination_definition(
-        org.airbyte_workspace_id, payload.destinationDefId
-    )
+    dbt_credentials = WAREHOUSE_DBT_CREDENTIALS_BUILDERS[payload.wtype](payload.airbyteConfig)
 
     warehouse = OrgWarehouse(
         org=org,
         name=payload.name,
         wtype=payload.wtype,
         credentials="",
-        airbyte_destination_id=destination["destinationId"],
-        airbyte_docker_repository=destination_definition["dockerRepository"],
-        airbyte_docker_image_tag=destination_definition["dockerImageTag"],
     )
     credentials_lookupkey = secretsmanager.save_warehouse_credentials(warehouse, dbt_credentials)
     warehouse.credentials = credentials_lookupkey
-    if "dataset_location" in destination["connectionConfiguration"]:
-        warehouse.bq_location = destination["connectionConfiguration"]["dataset_location"]
     warehouse.save()
 
-    create_or_update_org_cli_block(org, warehouse, payload.airbyteConfig)
+    had_cli_profile_block = OrgPrefectBlockv1.objects.filter(
+        org=org, block_type=DBTCLIPROFILE
+    ).exists()
+    (cli_profile_block, _), _ = create_or_update_org_cli_block(
+        org, warehouse, payload.airbyteConfig
+    )
 
-    return None, None
+    # the destination config is read back by create_warehouse_destination
+    # the cli profile block is recorded only if it was created for this warehouse
+    secretsmanager.save_pending_destination(
+        warehouse,
+        {
+            "destinationDefId": payload.destinationDefId,
+            "airbyteConfig": payload.airbyteConfig,
+            "cliProfileBlockId": (
+                cli_profile_block.block_id
+                if cli_profile_block and not had_cli_profile_block
+                else None
+            ),
+        },
+    )
+
+    return warehouse, None
+
+
+def create_warehouse_destination(warehouse: OrgWarehouse):
+    """creates the airbyte destination for a registered warehouse"""
+    org = warehouse.org
+
+    pending_destination = secretsmanager.retrieve_pending_destination(warehouse)
+    if pending_destination is None:
+        return None, "could not find the destination config for this warehouse"
+
+    # fetch the definition first so that nothing can fail after the destination is created
+    destination_definition = airbyte_service.get_destination_definition(
+        org.airbyte_workspace_id, pending_destination["destinationDefId"], org=org
+    )
+
+    destination = airbyte_service.create_destination(
+        org.airbyte_workspace_id,
+        f"{warehouse.wtype}-warehouse",
+        pending_destination["destinationDefId"],
+        pending_destination["airbyteConfig"],
+        org=org,
+    )
+    logger.info("created destination having id " + destination["destinationId"])
+
+    fields = {
+        "airbyte_destination_id": destination["destinationId"],
+        "airbyte_docker_repository": destination_definition["dockerRepository"],
+        "airbyte_docker_image_tag": destination_definition["dockerImageTag"],
+        "updated_at": django_timezone.now(),
+    }
+    if "dataset_location" in destination["connectionConfiguration"]:
+        fields["bq_location"] = destination["connectionConfiguration"]["dataset_location"]
+    OrgWarehouse.objects.filter(id=warehouse.id).update(**fields)
+    secretsmanager.delete_pending_destination(warehouse)
+
+    return destination["destinationId"], None
+
+
+def delete_unregistered_warehouse(warehouse: OrgWarehouse):
+    """
+    removes a warehouse whose airbyte destination could not be created
+    along with its credentials and the dbt cli profile block created for it,
+    so that it can be registered again
+    """
+    pending_destination = secretsmanager.retrieve_pending_destination(warehouse)
+    cli_profile_block = None
+    if pending_destination and pending_destination["cliProfileBlockId"]:
+        cli_profile_block = OrgPrefectBlockv1.objects.filter(
+            org=warehouse.org,
+            block_type=DBTCLIPROFILE,
+            block_id=pending_destination["cliProfileBlockId"],
+        ).first()
+
+    secretsmanager.delete_pending_destination(warehouse)
+    secretsmanager.delete_warehouse_credentials(warehouse)
+
+    # a block that existed before this warehouse was registered is left alone
+    if cli_profile_block:
+        try:
+            prefect_service.delete_dbt_cli_profile_block(cli_profile_block.block_id)
+        except Exception as error:
+            logger.error(
+                "could not delete the cli profile block %s: %s",
+                cli_profile_block.block_name,
+                str(error),
+            )
+        cli_profile_block.delete()
+
+    warehouse.delete()
 
 
 def create_or_update_org_cli_block(org: Org, warehouse: OrgWarehouse, airbyte_creds: dict):
@@ -1057,18 +1148,36 @@ def create_or_update_org_cli_block(org: Org, warehouse: OrgWarehouse, airbyte_cr
 
 def get_warehouses(org: Org):
     """return list of warehouses for an Org"""
+    org_warehouses = list(
+        OrgWarehouse.objects.filter(org=org).only(
+            "wtype",
+            "name",
+            "airbyte_destination_id",
+            "airbyte_docker_repository",
+            "airbyte_docker_image_tag",
+        )
+    )
+    if len(org_warehouses) == 0:
+        return [], None
+
+    # one call for the whole workspace instead of one per warehouse
+    destinations_by_id = {
+        destination["destinationId"]: destination
+        for destination in airbyte_service.get_destinations(org.airbyte_workspace_id)[
+            "destinations"
+        ]
+    }
+
     warehouses = [
         {
             "wtype": warehouse.wtype,
             # "credentials": warehouse.credentials,
             "name": warehouse.name,
-            "airbyte_destination": airbyte_service.get_destination(
-                org.airbyte_workspace_id, warehouse.airbyte_destination_id
-            ),
+            "airbyte_destination": destinations_by_id.get(warehouse.airbyte_destination_id),
             "airbyte_docker_repository": warehouse.airbyte_docker_repository,
             "airbyte_docker_image_tag": warehouse.airbyte_docker_image_tag,
         }
-        for warehouse in OrgWarehouse.objects.filter(org=org)
+        for warehouse in org_warehouses
     ]
     return warehouses, None
 
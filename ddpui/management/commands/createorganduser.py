@@ -50,7 +50,9 @@ class Command(BaseCommand):
             create_organization(
                 OrgSchema(name=options["orgname"], slug=slugify(options["orgname"]))
             )
-            print(f"Org {options['orgname']} created")
+            print(
+                f"Org {options['orgname']} created; a celery worker will set up its airbyte workspace"
+            )
         else:
             print(f"Org {options['orgname']} already exists")
         org = Org.objects.filter(name=options["orgname"]).first()
@@ -0,0 +1,19 @@
+# Generated by Django 4.2 on 2026-10-15 10:12
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ddpui", "0118_orgdataflowv1_meta"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="org",
+            index=models.Index(
+                django.db.models.functions.text.Upper("name"), name="org_name_upper_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2 on 2026-10-15 23:05
+
+from django.db import migrations, models
+
+
+def remove_duplicate_orgtncs(apps, schema_editor):
+    """keep only the earliest acceptance for every org"""
+    OrgTnC = apps.get_model("ddpui", "OrgTnC")
+    seen_orgs = set()
+    for orgtnc in OrgTnC.objects.order_by("org_id", "id"):
+        if orgtnc.org_id in seen_orgs:
+            orgtnc.delete()
+        else:
+            seen_orgs.add(orgtnc.org_id)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ddpui", "0119_org_org_name_upper_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_orgtncs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="orgtnc",
+            constraint=models.UniqueConstraint(fields=("org",), name="orgtnc_unique_org"),
+        ),
+    ]
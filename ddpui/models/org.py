@@ -1,6 +1,7 @@
 from typing import Dict, Optional
 from enum import Enum
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils import timezone
 from ninja import Schema
 
@@ -75,6 +76,12 @@ class Org(models.Model):
     created_at = models.DateTimeField(auto_created=True, default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # postgres runs name__iexact as UPPER(name) = UPPER(...)
+            models.Index(Upper("name"), name="org_name_upper_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"Org[{self.slug}|{self.name}|{self.airbyte_workspace_id}]"
 
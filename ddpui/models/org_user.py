@@ -9,7 +9,7 @@ from django.db import models
 from django.contrib.auth.models import User
 
 from ninja import Schema
-from pydantic import SecretStr
+from pydantic import SecretStr, validator
 
 from ddpui.models.org import Org, OrgSchema
 from ddpui.models.role_based_access import Role
@@ -78,6 +78,11 @@ class OrgUser(models.Model):
         return self.user.email  # pylint: disable=no-member
 
 
+def normalize_email(value):
+    """emails are stored trimmed and in lowercase"""
+    return value.strip().lower() if isinstance(value, str) else value
+
+
 class OrgUserCreate(Schema):
     """payload to create a new OrgUser"""
 
@@ -86,6 +91,8 @@ class OrgUserCreate(Schema):
     signupcode: str
     role: str = None
 
+    _normalize_email = validator("email", pre=True, allow_reuse=True)(normalize_email)
+
 
 class OrgUserUpdate(Schema):
     """payload to update an existing OrgUser"""
@@ -111,6 +118,10 @@ class OrgUserUpdateNewRole(Schema):
     toupdate_email: str
     role_uuid: uuid.UUID
 
+    _normalize_toupdate_email = validator("toupdate_email", pre=True, allow_reuse=True)(
+        normalize_email
+    )
+
 
 class OrgUserNewOwner(Schema):
     """payload to transfer account ownership"""
@@ -11,5 +11,8 @@ class OrgTnC(models.Model):
     tnc_accepted_on = models.DateField(null=False)
     tnc_accepted_by = models.ForeignKey(OrgUser, on_delete=models.CASCADE, null=False)
 
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["org"], name="orgtnc_unique_org")]
+
     def __str__(self) -> str:
         return f"OrgTnC[{self.org.slug}|{self.tnc_accepted_on}|{self.orguser.user.email}]"
@@ -18,6 +18,9 @@ from ddpui.api.user_preferences_api import userpreference_router
 from ddpui.api.org_preferences_api import orgpreference_router
 from ddpui.api.warehouse_api import warehouse_router
 from ddpui.api.webhook_api import webhook_router
+from ddpui.utils.custom_logger import CustomLogger
+
+logger = CustomLogger("ddpui")
 
 
 src_api = NinjaAPI(
@@ -92,3 +95,15 @@ src_api.add_router("/api/warehouse/", warehouse_router)
 src_api.add_router("/api/", user_org_router)
 src_api.add_router("/webhooks/", webhook_router)
 src_api.add_router("/api/orgpreferences/", orgpreference_router)
+
+
+def warm_api():
+    """
+    builds the openapi schema once when a worker starts, which populates the url resolver
+    and pydantic's per-model schema caches ahead of the first request
+    a failure here only affects the docs, so it must not stop the worker from booting
+    """
+    try:
+        src_api.get_openapi_schema()
+    except Exception as err:  # skipcq PYL-W0703
+        logger.error("could not build the openapi schema: %s", str(err))
@@ -645,7 +645,7 @@ def test_get_airbyte_destination_without_workspace(orguser):
 
 @patch.multiple(
     "ddpui.ddpairbyte.airbyte_service",
-    get_destination=Mock(return_value={"fake-key": "fake-val"}),
+    get_destination_cached=Mock(return_value={"fake-key": "fake-val"}),
 )
 def test_get_airbyte_destination_success(orguser_workspace):
     """tests GET /source_definitions"""
@@ -1,3 +1,4 @@
+import json
 import uuid
 import os
 import django
@@ -15,6 +16,7 @@ django.setup()
 from ddpui.api.user_org_api import (
     get_current_user_v2,
     post_organization_user,
+    post_login,
     get_organization_users,
     delete_organization_users,
     delete_organization_users_v1,
@@ -68,6 +70,7 @@ from ddpui.models.orgtnc import OrgTnC
 from ddpui.utils import timezone
 from ddpui.utils.custom_logger import CustomLogger
 from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
 
 pytestmark = pytest.mark.django_db
 
@@ -160,6 +163,7 @@ def orguserwithoutorg(authuser):
 def mock_request(orguser: OrgUser = None):
     mock_request = Mock()
     mock_request.orguser = orguser
+    mock_request.org = orguser.org if orguser else None
     mock_request.permissions = []
     if orguser and orguser.new_role:
         permission_slugs = RolePermission.objects.filter(role=orguser.new_role).values_list(
@@ -211,6 +215,47 @@ def test_get_current_userv2_has_user(authuser, org_with_workspace, org_without_w
         assert response[0].role == orguser2.role
 
 
+# ================================================================================
+def login_request(username: str, password: str):
+    """a request carrying the login payload"""
+    request = Mock()
+    request.body = json.dumps({"username": username, "password": password})
+    return request
+
+
+def test_post_login_wrong_password():
+    """a failing test, the password does not match"""
+    user = User.objects.create_user(
+        username="login@useremail.com", email="login@useremail.com", password="the-password"
+    )
+    response = post_login(login_request("login@useremail.com", "not-the-password"))
+    assert response.status_code == 400
+    assert json.loads(response.content) == {
+        "non_field_errors": ["Unable to log in with provided credentials."]
+    }
+    user.delete()
+
+
+def test_post_login_missing_password():
+    """a failing test, the password is not in the payload"""
+    request = Mock()
+    request.body = json.dumps({"username": "login@useremail.com"})
+    response = post_login(request)
+    assert response.status_code == 400
+    assert json.loads(response.content) == {"password": ["This field is required."]}
+
+
+def test_post_login_success():
+    """a success test, returns the user along with an auth token"""
+    user = User.objects.create_user(
+        username="login@useremail.com", email="login@useremail.com", password="the-password"
+    )
+    response = post_login(login_request("login@useremail.com", "the-password"))
+    assert response["email"] == "login@useremail.com"
+    assert response["token"] == Token.objects.get(user=user).key
+    user.delete()
+
+
 # ================================================================================
 def test_post_organization_user_wrong_signupcode(orguser):
     """a failing test, signup without the signup code"""
@@ -278,7 +323,7 @@ def test_post_organization_user_invalid_email(orguser):
     assert str(excinfo.value) == "that is not a valid email address"
 
 
-@patch.multiple("ddpui.utils.sendgrid", send_signup_email=Mock(return_value=1))
+@patch("ddpui.core.orguserfunctions.send_signup_email_task.delay", Mock())
 def test_post_organization_user_success(orguser):
     """a success test"""
     request = mock_request(orguser)
@@ -303,15 +348,16 @@ def test_post_organization_user_success(orguser):
         the_authuser.delete()
 
 
-@patch.multiple("ddpui.utils.sendgrid", send_signup_email=Mock(return_value=1))
+@patch("ddpui.core.orguserfunctions.send_signup_email_task.delay", Mock())
 def test_post_organization_user_success_lowercase_email(orguser):
     """a success test"""
     request = mock_request(orguser)
     payload = OrgUserCreate(
-        email="TEST@useremail.com",
+        email=" TEST@useremail.com ",
         password="test-userpassword",
         signupcode="right-signupcode",
     )
+    assert payload.email == "test@useremail.com"
     the_authuser = User.objects.filter(email__iexact=payload.email).first()
     if the_authuser:
         the_authuser.delete()
@@ -329,16 +375,6 @@ def test_post_organization_user_success_lowercase_email(orguser):
 
 
 # ================================================================================
-def test_get_organization_users_no_org(orguser):
-    """a failing test, requestor has no associated org"""
-    orguser.org = None
-    request = mock_request(orguser)
-
-    with pytest.raises(HttpError) as excinfo:
-        get_organization_users(request)
-    assert str(excinfo.value) == "no associated org"
-
-
 def test_get_organization_users(orguser):
     """a success test"""
     request = mock_request(orguser)
@@ -349,28 +385,6 @@ def test_get_organization_users(orguser):
 
 
 # ================================================================================
-def test_delete_organization_users_no_org(orguser):
-    """a failing test, requestor has no associated org"""
-    orguser.org = None
-    request = mock_request(orguser)
-    payload = DeleteOrgUserPayload(email="email-dne")
-
-    with pytest.raises(HttpError) as excinfo:
-        delete_organization_users(request, payload)
-    assert str(excinfo.value) == "no associated org"
-
-
-def test_delete_organization_users_no_org_v1(orguser):
-    """a failing test, requestor has no associated org"""
-    orguser.org = None
-    request = mock_request(orguser)
-    payload = DeleteOrgUserPayload(email="email-dne")
-
-    with pytest.raises(HttpError) as excinfo:
-        delete_organization_users_v1(request, payload)
-    assert str(excinfo.value) == "no associated org"
-
-
 def test_delete_organization_users_wrong_org(orguser):
     """a failing test, orguser dne"""
     request = mock_request(orguser)
@@ -653,15 +667,26 @@ def test_post_organization_warehouse_unknownwtype(orguser):
     assert str(excinfo.value) == "unrecognized warehouse type unknown"
 
 
-@patch.multiple(
-    "ddpui.ddpairbyte.airbyte_service",
-    create_destination=Mock(
-        return_value={"destinationId": "destination-id", "connectionConfiguration": {}}
-    ),
-    get_destination_definition=Mock(
-        return_value={"dockerRepository": "docker-repo", "dockerImageTag": "0.0.0"}
-    ),
-)
+def test_post_organization_warehouse_no_workspace(orguser):
+    """a failing test, the org's airbyte workspace hasn't been set up yet"""
+    request = mock_request(orguser)
+    payload = OrgWarehouseSchema(
+        wtype="bigquery",
+        name="bigquery",
+        destinationDefId="destinationDefId",
+        airbyteConfig={"credentials_json": "{}"},
+    )
+
+    with pytest.raises(HttpError) as excinfo:
+        post_organization_warehouse(request, payload)
+
+    assert (
+        str(excinfo.value)
+        == "the airbyte workspace for this org is still being set up, please try again shortly"
+    )
+    assert not OrgWarehouse.objects.filter(org=orguser.org).exists()
+
+
 @patch.multiple(
     "ddpui.utils.secretsmanager",
     save_warehouse_credentials=Mock(return_value="credentials_lookupkey"),
@@ -670,8 +695,17 @@ def test_post_organization_warehouse_unknownwtype(orguser):
     "ddpui.ddpairbyte.airbytehelpers",
     create_or_update_org_cli_block=Mock(return_value=((None, None), None)),
 )
-def test_post_organization_warehouse_bigquery(orguser):
+@patch("ddpui.utils.secretsmanager.save_pending_destination")
+@patch("ddpui.api.user_org_api.create_airbyte_destination.delay")
+def test_post_organization_warehouse_bigquery(
+    create_airbyte_destination_mock: Mock,
+    save_pending_destination_mock: Mock,
+    orguser,
+    django_capture_on_commit_callbacks,
+):
     """success test, warehouse creation"""
+    orguser.org.airbyte_workspace_id = "FAKE-WORKSPACE-ID"
+    orguser.org.save()
     request = mock_request(orguser)
     payload = OrgWarehouseSchema(
         wtype="bigquery",
@@ -680,14 +714,27 @@ def test_post_organization_warehouse_bigquery(orguser):
         airbyteConfig={"credentials_json": "{}"},
     )
 
-    response = post_organization_warehouse(request, payload)
+    with django_capture_on_commit_callbacks(execute=True):
+        response = post_organization_warehouse(request, payload)
 
     assert response["success"] == 1
 
     warehouse = OrgWarehouse.objects.filter(org=orguser.org).first()
+    assert response["warehouse_id"] == warehouse.id
     assert warehouse.wtype == "bigquery"
-    assert warehouse.airbyte_destination_id == "destination-id"
+    # the destination is created by the celery task
+    assert warehouse.airbyte_destination_id is None
     assert warehouse.credentials == "credentials_lookupkey"
+    # the airbyte config is kept in the secrets manager rather than sent to the task broker
+    save_pending_destination_mock.assert_called_once_with(
+        warehouse,
+        {
+            "destinationDefId": "destinationDefId",
+            "airbyteConfig": {"credentials_json": "{}"},
+            "cliProfileBlockId": None,
+        },
+    )
+    create_airbyte_destination_mock.assert_called_once_with(warehouse.id, orguser.id)
 
 
 # ================================================================================
@@ -713,15 +760,14 @@ def test_post_organization_warehouse_bigquery(orguser):
 # ================================================================================
 @patch.multiple(
     "ddpui.ddpairbyte.airbyte_service",
-    get_destination=Mock(
-        side_effect=[
-            {
-                "destination_id": "destination_id_1",
-            },
-            {
-                "destination_id": "destination_id_2",
-            },
-        ]
+    get_destinations=Mock(
+        return_value={
+            "destinations": [
+                {"destinationId": "destination_id_1"},
+                {"destinationId": "destination_id_2"},
+                {"destinationId": "destination_id_3"},
+            ]
+        }
     ),
 )
 def test_get_organizations_warehouses(orguser):
@@ -742,15 +788,15 @@ def test_get_organizations_warehouses(orguser):
     assert "warehouses" in response
     assert len(response["warehouses"]) == 2
     assert response["warehouses"][0]["wtype"] == "postgres"
-    assert response["warehouses"][0]["airbyte_destination"]["destination_id"] == "destination_id_1"
+    assert response["warehouses"][0]["airbyte_destination"]["destinationId"] == "destination_id_1"
     assert response["warehouses"][1]["wtype"] == "postgres"
-    assert response["warehouses"][1]["airbyte_destination"]["destination_id"] == "destination_id_2"
+    assert response["warehouses"][1]["airbyte_destination"]["destinationId"] == "destination_id_2"
     warehouse1.delete()
     warehouse2.delete()
 
 
 # ================================================================================
-@patch("ddpui.utils.sendgrid.send_invite_user_email", Mock())
+@patch("ddpui.core.orguserfunctions.send_invite_user_email_task.delay", Mock())
 def test_post_organization_user_invite_no_org(orguser):
     """failing test, no org"""
     orguser.org = None
@@ -761,7 +807,7 @@ def test_post_organization_user_invite_no_org(orguser):
     assert str(excinfo.value) == "create an organization first"
 
 
-@patch("ddpui.utils.sendgrid.send_invite_user_email", Mock())
+@patch("ddpui.core.orguserfunctions.send_invite_user_email_task.delay", Mock())
 def test_post_organization_user_invite_v1_no_org(orguser):
     """failing test, no org"""
     orguser.org = None
@@ -775,7 +821,7 @@ def test_post_organization_user_invite_v1_no_org(orguser):
     assert str(excinfo.value) == "create an organization first"
 
 
-@patch("ddpui.utils.sendgrid.send_invite_user_email", Mock())
+@patch("ddpui.core.orguserfunctions.send_invite_user_email_task.delay", Mock())
 def test_post_organization_user_invite_nosuchrole(orguser):
     """failing test, no such role"""
     request = mock_request(orguser)
@@ -785,7 +831,7 @@ def test_post_organization_user_invite_nosuchrole(orguser):
     assert str(excinfo.value) == "Invalid role"
 
 
-@patch("ddpui.utils.sendgrid.send_invite_user_email", Mock())
+@patch("ddpui.core.orguserfunctions.send_invite_user_email_task.delay", Mock())
 def test_post_organization_user_invite_v1_nosuchrole(orguser):
     """failing test, no such role"""
     request = mock_request(orguser)
@@ -795,7 +841,7 @@ def test_post_organization_user_invite_v1_nosuchrole(orguser):
     assert str(excinfo.value) == "Invalid role"
 
 
-@patch("ddpui.utils.sendgrid.send_invite_user_email", Mock())
+@patch("ddpui.core.orguserfunctions.send_invite_user_email_task.delay", Mock())
 def test_post_organization_user_invite_insufficientrole(orguser):
     """failing test, no such role"""
     orguser.role = 1
@@ -806,7 +852,7 @@ def test_post_organization_user_invite_insufficientrole(orguser):
     assert str(excinfo.value) == "Insufficient permissions for this operation"
 
 
-@patch("ddpui.utils.sendgrid.send_invite_user_email", Mock())
+@patch("ddpui.core.orguserfunctions.send_invite_user_email_task.delay", Mock())
 def test_post_organization_user_invite_v1_insufficientrole(orguser):
     """failing test, no such role"""
     request = mock_request(orguser)
@@ -819,7 +865,7 @@ def test_post_organization_user_invite_v1_insufficientrole(orguser):
     assert str(excinfo.value) == "Insufficient permissions for this operation"
 
 
-@patch("ddpui.utils.sendgrid.send_invite_user_email", mock_sendgrid=Mock())
+@patch("ddpui.core.orguserfunctions.send_invite_user_email_task.delay", mock_sendgrid=Mock())
 def test_post_organization_user_invite(mock_sendgrid, orguser):
     """success test, inviting a new user"""
     payload = InvitationSchema(
@@ -850,7 +896,7 @@ def test_post_organization_user_invite(mock_sendgrid, orguser):
     mock_sendgrid.assert_called_once()
 
 
-@patch("ddpui.utils.sendgrid.send_invite_user_email", mock_sendgrid=Mock())
+@patch("ddpui.core.orguserfunctions.send_invite_user_email_task.delay", mock_sendgrid=Mock())
 def test_post_organization_user_invite_v1(mock_sendgrid, orguser):
     """success test, inviting a new user"""
     payload = NewInvitationSchema(
@@ -878,7 +924,7 @@ def test_post_organization_user_invite_v1(mock_sendgrid, orguser):
     mock_sendgrid.assert_called_once()
 
 
-@patch("ddpui.utils.sendgrid.send_invite_user_email", mock_sendgrid=Mock())
+@patch("ddpui.core.orguserfunctions.send_invite_user_email_task.delay", mock_sendgrid=Mock())
 def test_post_organization_user_invite_multiple_open_invites(mock_sendgrid, orguser):
     """success test, inviting a new user"""
     another_org = Org.objects.create(name="anotherorg", slug="anotherorg")
@@ -921,7 +967,7 @@ def test_post_organization_user_invite_multiple_open_invites(mock_sendgrid, orgu
     mock_sendgrid.assert_called_once()
 
 
-@patch("ddpui.utils.sendgrid.send_invite_user_email", mock_sendgrid=Mock())
+@patch("ddpui.core.orguserfunctions.send_invite_user_email_task.delay", mock_sendgrid=Mock())
 def test_post_organization_user_invite_v1_multiple_open_invites(mock_sendgrid, orguser):
     """success test, inviting a new user"""
     another_org = Org.objects.create(name="anotherorg", slug="anotherorg")
@@ -962,7 +1008,7 @@ def test_post_organization_user_invite_v1_multiple_open_invites(mock_sendgrid, o
     mock_sendgrid.assert_called_once()
 
 
-@patch("ddpui.utils.sendgrid.send_invite_user_email", mock_sendgrid=Mock())
+@patch("ddpui.core.orguserfunctions.send_invite_user_email_task.delay", mock_sendgrid=Mock())
 def test_post_organization_user_invite_lowercase_email(mock_sendgrid, orguser: OrgUser):
     """success test, inviting a new user"""
     payload = InvitationSchema(
@@ -997,7 +1043,7 @@ def test_post_organization_user_invite_lowercase_email(mock_sendgrid, orguser: O
     mock_sendgrid.assert_called_once()
 
 
-@patch("ddpui.utils.sendgrid.send_invite_user_email", mock_sendgrid=Mock())
+@patch("ddpui.core.orguserfunctions.send_invite_user_email_task.delay", mock_sendgrid=Mock())
 def test_post_organization_user_invite_v1_lowercase_email(mock_sendgrid, orguser: OrgUser):
     """success test, inviting a new user"""
     payload = NewInvitationSchema(
@@ -1027,7 +1073,7 @@ def test_post_organization_user_invite_v1_lowercase_email(mock_sendgrid, orguser
     mock_sendgrid.assert_called_once()
 
 
-@patch("ddpui.utils.sendgrid.send_youve_been_added_email", mock_sendgrid=Mock())
+@patch("ddpui.core.orguserfunctions.send_youve_been_added_email_task.delay", mock_sendgrid=Mock())
 def test_post_organization_user_invite_user_exists(mock_sendgrid, orguser: OrgUser):
     """success test, inviting an existing user"""
     user = User.objects.create(email="existinguser", username="existinguser")
@@ -1051,7 +1097,7 @@ def test_post_organization_user_invite_user_exists(mock_sendgrid, orguser: OrgUs
     assert response.invited_role == payload.invited_role
 
 
-@patch("ddpui.utils.sendgrid.send_youve_been_added_email", mock_sendgrid=Mock())
+@patch("ddpui.core.orguserfunctions.send_youve_been_added_email_task.delay", mock_sendgrid=Mock())
 def test_post_organization_user_invite_v1_user_exists(mock_sendgrid, orguser: OrgUser):
     """success test, inviting an existing user"""
     user = User.objects.create(email="existinguser", username="existinguser")
@@ -1339,9 +1385,9 @@ def test_post_forgot_password_nosuchuser():
     assert response["success"] == 1
 
 
-@patch.multiple(
-    "ddpui.utils.sendgrid",
-    send_password_reset_email=Mock(side_effect=Exception("error")),
+@patch(
+    "ddpui.core.orguserfunctions.send_password_reset_email_task.delay",
+    Mock(side_effect=Exception("error")),
 )
 def test_post_forgot_password_emailfailed():
     """failure test, could not send email"""
@@ -1354,7 +1400,7 @@ def test_post_forgot_password_emailfailed():
     assert str(excinfo.value) == "failed to send email"
 
 
-@patch.multiple("ddpui.utils.sendgrid", send_password_reset_email=Mock(return_value=1))
+@patch("ddpui.core.orguserfunctions.send_password_reset_email_task.delay", Mock())
 def test_post_forgot_password_success():
     """success test, forgot password email sent"""
     mock_request = Mock()
@@ -1465,16 +1511,7 @@ def test_get_invitations_v1(orguser):
 
 
 # ================================================================================
-def test_post_resend_invitation_no_org(orguser):
-    """failure - no org"""
-    orguser.org = None
-    request = mock_request(orguser)
-    with pytest.raises(HttpError) as excinfo:
-        post_resend_invitation(request, 1)
-    assert str(excinfo.value) == "create an organization first"
-
-
-@patch("ddpui.utils.sendgrid.send_invite_user_email", sendgrid=Mock())
+@patch("ddpui.core.orguserfunctions.send_invite_user_email_task.delay", sendgrid=Mock())
 def test_post_resend_invitation(sendgrid: Mock, orguser):
     """success test"""
     original_invited_on = timezone.as_ist(datetime(2023, 1, 1, 10, 0, 0))
@@ -1495,15 +1532,6 @@ def test_post_resend_invitation(sendgrid: Mock, orguser):
 
 
 # ================================================================================
-def test_delete_invitation_no_org(orguser):
-    """failure - no org"""
-    orguser.org = None
-    request = mock_request(orguser)
-    with pytest.raises(HttpError) as excinfo:
-        delete_invitation(request, 1)
-    assert str(excinfo.value) == "create an organization first"
-
-
 def test_delete_invitation(orguser):
     """success"""
     original_invited_on = timezone.as_ist(datetime(2023, 1, 1, 10, 0, 0))
@@ -9,7 +9,16 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ddpui.settings")
 os.environ["DJANGO_ALLOW_ASYNC_UNSAFE"] = "true"
 django.setup()
 
-from ddpui.models.org import Org, OrgDbt, OrgWarehouse, TransformType, OrgSchemaChange
+from ddpui.models.org import (
+    Org,
+    OrgDbt,
+    OrgWarehouse,
+    TransformType,
+    OrgSchemaChange,
+    OrgPrefectBlockv1,
+)
+from ninja.errors import HttpError
+from ddpui.ddpprefect import AIRBYTESERVER, DBTCLIPROFILE
 from ddpui.models.org_user import OrgUser, Role
 from ddpui.models.dbt_workflow import OrgDbtModel
 from ddpui.tests.api_tests.test_user_org_api import (
@@ -25,6 +34,8 @@ from ddpui.celeryworkers.tasks import (
     setup_dbtworkspace,
     detect_schema_changes_for_org,
     get_connection_catalog_task,
+    setup_airbyte_workspace_for_org,
+    create_airbyte_destination,
 )
 from ddpui.models.tasks import TaskProgressStatus
 from ddpui.core.dbtautomation_service import sync_sources_for_warehouse
@@ -456,3 +467,218 @@ def test_get_connection_catalog_task_success(org_without_workspace: Org):
             },
         },
     ]
+
+
+def test_setup_airbyte_workspace_for_org_already_has_workspace():
+    """tests setup_airbyte_workspace_for_org"""
+    org = Org.objects.create(name="org-name", slug="org-slug", airbyte_workspace_id="wsid")
+    OrgPrefectBlockv1.objects.create(
+        org=org, block_type=AIRBYTESERVER, block_id="block-id", block_name="block-name"
+    )
+    with patch(
+        "ddpui.ddpairbyte.airbytehelpers.setup_airbyte_workspace_v1"
+    ) as setup_airbyte_workspace_v1_mock, patch(
+        "ddpui.ddpairbyte.airbytehelpers.ensure_airbyte_server_block"
+    ) as ensure_airbyte_server_block_mock:
+        setup_airbyte_workspace_for_org(org.id)
+        setup_airbyte_workspace_v1_mock.assert_not_called()
+        ensure_airbyte_server_block_mock.assert_not_called()
+    org.delete()
+
+
+def test_setup_airbyte_workspace_for_org_notifies_on_last_failure(org_without_workspace: Org):
+    """the org's managers are told once the retries have run out"""
+    with patch(
+        "ddpui.ddpairbyte.airbytehelpers.setup_airbyte_workspace_v1",
+        side_effect=Exception("airbyte is down"),
+    ), patch("ddpui.celeryworkers.tasks.notify_org_managers") as notify_org_managers_mock:
+        result = setup_airbyte_workspace_for_org.apply(
+            args=(org_without_workspace.id,),
+            retries=setup_airbyte_workspace_for_org.max_retries,
+        )
+
+    assert result.failed()
+    notify_org_managers_mock.assert_called_once()
+    assert notify_org_managers_mock.call_args[0][0] == org_without_workspace
+
+
+def test_setup_airbyte_workspace_for_org_retry_after_workspace_created():
+    """a previous attempt created the workspace but not the airbyte server block"""
+    org = Org.objects.create(name="org-name", slug="org-slug", airbyte_workspace_id="wsid")
+    with patch(
+        "ddpui.ddpairbyte.airbytehelpers.setup_airbyte_workspace_v1"
+    ) as setup_airbyte_workspace_v1_mock, patch(
+        "ddpui.ddpairbyte.airbytehelpers.ensure_airbyte_server_block"
+    ) as ensure_airbyte_server_block_mock, patch(
+        "ddpui.celeryworkers.tasks.add_custom_connectors_to_workspace.delay"
+    ) as add_custom_connectors_mock:
+        setup_airbyte_workspace_for_org(org.id)
+        setup_airbyte_workspace_v1_mock.assert_not_called()
+        ensure_airbyte_server_block_mock.assert_called_once()
+        assert add_custom_connectors_mock.call_args[0][0] == "wsid"
+    org.delete()
+
+
+def test_setup_airbyte_workspace_for_org_success(org_without_workspace: Org):
+    """tests setup_airbyte_workspace_for_org"""
+    with patch(
+        "ddpui.ddpairbyte.airbytehelpers.setup_airbyte_workspace_v1"
+    ) as setup_airbyte_workspace_v1_mock, patch(
+        "ddpui.celeryworkers.tasks.add_custom_connectors_to_workspace.delay"
+    ) as add_custom_connectors_mock:
+        setup_airbyte_workspace_v1_mock.return_value = Mock(workspaceId="wsid")
+        setup_airbyte_workspace_for_org(org_without_workspace.id)
+        setup_airbyte_workspace_v1_mock.assert_called_once()
+        add_custom_connectors_mock.assert_called_once()
+        assert add_custom_connectors_mock.call_args[0][0] == "wsid"
+
+
+def test_create_airbyte_destination_success(orguser: OrgUser):
+    """tests create_airbyte_destination"""
+    warehouse = OrgWarehouse.objects.create(
+        org=orguser.org, wtype="bigquery", name="bigquery", credentials="credentials_lookupkey"
+    )
+    pending_destination = {
+        "destinationDefId": "destinationDefId",
+        "airbyteConfig": {"dataset_location": "asia-south1"},
+        "cliProfileBlockId": None,
+    }
+    with patch(
+        "ddpui.utils.secretsmanager.retrieve_pending_destination",
+        return_value=pending_destination,
+    ), patch(
+        "ddpui.utils.secretsmanager.delete_pending_destination"
+    ) as delete_pending_destination_mock, patch(
+        "ddpui.ddpairbyte.airbyte_service.create_destination",
+        return_value={
+            "destinationId": "destination-id",
+            "connectionConfiguration": {"dataset_location": "asia-south1"},
+        },
+    ) as create_destination_mock, patch(
+        "ddpui.ddpairbyte.airbyte_service.get_destination_definition",
+        return_value={"dockerRepository": "docker-repo", "dockerImageTag": "0.0.0"},
+    ):
+        create_airbyte_destination(warehouse.id, orguser.id)
+
+    # the task has no request, so the org is passed on to route the airbyte call
+    create_destination_mock.assert_called_once_with(
+        orguser.org.airbyte_workspace_id,
+        "bigquery-warehouse",
+        "destinationDefId",
+        {"dataset_location": "asia-south1"},
+        org=orguser.org,
+    )
+    delete_pending_destination_mock.assert_called_once()
+    warehouse.refresh_from_db()
+    assert warehouse.airbyte_destination_id == "destination-id"
+    assert warehouse.airbyte_docker_repository == "docker-repo"
+    assert warehouse.airbyte_docker_image_tag == "0.0.0"
+    assert warehouse.bq_location == "asia-south1"
+
+
+def test_create_airbyte_destination_gives_up(orguser: OrgUser):
+    """the warehouse and the block created for it are removed once the retries run out"""
+    warehouse = OrgWarehouse.objects.create(
+        org=orguser.org, wtype="postgres", name="postgres", credentials="credentials_lookupkey"
+    )
+    OrgPrefectBlockv1.objects.create(
+        org=orguser.org, block_type=DBTCLIPROFILE, block_id="block-id", block_name="block-name"
+    )
+    pending_destination = {
+        "destinationDefId": "destinationDefId",
+        "airbyteConfig": {},
+        "cliProfileBlockId": "block-id",
+    }
+    with patch(
+        "ddpui.utils.secretsmanager.retrieve_pending_destination",
+        return_value=pending_destination,
+    ), patch("ddpui.utils.secretsmanager.delete_pending_destination"), patch(
+        "ddpui.ddpairbyte.airbyte_service.get_destination_definition",
+        side_effect=Exception("airbyte is down"),
+    ), patch(
+        "ddpui.utils.secretsmanager.delete_warehouse_credentials"
+    ) as delete_warehouse_credentials_mock, patch(
+        "ddpui.ddpprefect.prefect_service.delete_dbt_cli_profile_block"
+    ) as delete_dbt_cli_profile_block_mock, patch(
+        "ddpui.celeryworkers.tasks.create_notification", return_value=(None, {})
+    ) as create_notification_mock:
+        result = create_airbyte_destination.apply(
+            args=(warehouse.id, orguser.id), retries=create_airbyte_destination.max_retries
+        )
+
+    assert result.successful()
+    delete_warehouse_credentials_mock.assert_called_once()
+    delete_dbt_cli_profile_block_mock.assert_called_once_with("block-id")
+    assert not OrgPrefectBlockv1.objects.filter(block_id="block-id").exists()
+    assert not OrgWarehouse.objects.filter(id=warehouse.id).exists()
+    create_notification_mock.assert_called_once()
+    assert create_notification_mock.call_args[0][0].recipients == [orguser.id]
+
+
+def test_create_airbyte_destination_retries_server_errors(orguser: OrgUser):
+    """an error from the airbyte server is retried"""
+    warehouse = OrgWarehouse.objects.create(
+        org=orguser.org, wtype="postgres", name="postgres", credentials="credentials_lookupkey"
+    )
+    with patch(
+        "ddpui.utils.secretsmanager.retrieve_pending_destination",
+        return_value={"destinationDefId": "destinationDefId", "airbyteConfig": {}},
+    ), patch(
+        "ddpui.ddpairbyte.airbyte_service.get_destination_definition",
+        side_effect=HttpError(500, "airbyte is down"),
+    ), patch(
+        "ddpui.celeryworkers.tasks.create_notification"
+    ) as create_notification_mock:
+        with pytest.raises(HttpError):
+            create_airbyte_destination(warehouse.id, orguser.id)
+
+    create_notification_mock.assert_not_called()
+    assert OrgWarehouse.objects.filter(id=warehouse.id).exists()
+
+
+def test_create_airbyte_destination_rejected(orguser: OrgUser):
+    """a config rejected by airbyte is not retried, and an existing cli profile block is kept"""
+    warehouse = OrgWarehouse.objects.create(
+        org=orguser.org, wtype="postgres", name="postgres", credentials="credentials_lookupkey"
+    )
+    OrgPrefectBlockv1.objects.create(
+        org=orguser.org, block_type=DBTCLIPROFILE, block_id="block-id", block_name="block-name"
+    )
+    pending_destination = {
+        "destinationDefId": "destinationDefId",
+        "airbyteConfig": {},
+        "cliProfileBlockId": None,
+    }
+    with patch(
+        "ddpui.utils.secretsmanager.retrieve_pending_destination",
+        return_value=pending_destination,
+    ), patch("ddpui.utils.secretsmanager.delete_pending_destination"), patch(
+        "ddpui.ddpairbyte.airbyte_service.get_destination_definition",
+        return_value={"dockerRepository": "docker-repo", "dockerImageTag": "0.0.0"},
+    ), patch(
+        "ddpui.ddpairbyte.airbyte_service.create_destination",
+        side_effect=HttpError(422, "invalid host"),
+    ), patch(
+        "ddpui.utils.secretsmanager.delete_warehouse_credentials"
+    ), patch(
+        "ddpui.ddpprefect.prefect_service.delete_dbt_cli_profile_block"
+    ) as delete_dbt_cli_profile_block_mock, patch(
+        "ddpui.celeryworkers.tasks.create_notification", return_value=(None, {})
+    ) as create_notification_mock:
+        create_airbyte_destination(warehouse.id, orguser.id)
+
+    assert not OrgWarehouse.objects.filter(id=warehouse.id).exists()
+    delete_dbt_cli_profile_block_mock.assert_not_called()
+    assert OrgPrefectBlockv1.objects.filter(block_id="block-id").exists()
+    create_notification_mock.assert_called_once()
+    assert "invalid host" in create_notification_mock.call_args[0][0].message
+
+
+def test_create_airbyte_destination_already_has_destination(orguser: OrgUser):
+    """tests create_airbyte_destination"""
+    warehouse = OrgWarehouse.objects.create(
+        org=orguser.org, wtype="postgres", airbyte_destination_id="destination-id"
+    )
+    with patch("ddpui.ddpairbyte.airbyte_service.create_destination") as create_destination_mock:
+        create_airbyte_destination(warehouse.id, orguser.id)
+        create_destination_mock.assert_not_called()
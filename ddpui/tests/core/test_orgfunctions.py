@@ -0,0 +1,59 @@
+import os
+from unittest.mock import patch
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ddpui.settings")
+os.environ["DJANGO_ALLOW_ASYNC_UNSAFE"] = "true"
+django.setup()
+
+import pytest
+from ddpui.models.org import Org, CreateOrgSchema
+from ddpui.core.orgfunctions import create_organization
+
+pytestmark = pytest.mark.django_db
+
+
+def create_org_payload(name: str):
+    """payload for a free trial org"""
+    return CreateOrgSchema(
+        name=name,
+        base_plan="Free Trial",
+        can_upgrade_plan=True,
+        subscription_duration="Monthly",
+        superset_included=False,
+        start_date=None,
+        end_date=None,
+    )
+
+
+# ================================================================================
+def test_create_organization_name_exists():
+    """an org with the same name in a different case already exists"""
+    org = Org.objects.create(name="Existing Org", slug="existing-org")
+    payload = create_org_payload("existing org")
+
+    with patch(
+        "ddpui.core.orgfunctions.setup_airbyte_workspace_for_org.delay"
+    ) as setup_workspace_mock:
+        new_org, error = create_organization(payload)
+
+    assert new_org is None
+    assert error == "client org with this name already exists"
+    setup_workspace_mock.assert_not_called()
+    org.delete()
+
+
+def test_create_organization_queues_workspace_setup(django_capture_on_commit_callbacks):
+    """the airbyte workspace is set up by a celery task once the org is committed"""
+    payload = create_org_payload("New Org")
+
+    with patch(
+        "ddpui.core.orgfunctions.setup_airbyte_workspace_for_org.delay"
+    ) as setup_workspace_mock, django_capture_on_commit_callbacks(execute=True):
+        org, error = create_organization(payload)
+
+    assert error is None
+    assert org.slug == "new-org"
+    assert org.airbyte_workspace_id is None
+    setup_workspace_mock.assert_called_once_with(org.id)
+    org.delete()
@@ -15,6 +15,7 @@ from ddpui.auth import (
     CanManagePipelines,
     CanManageUsers,
     FullAccess,
+    CustomAuthMiddleware,
 )
 from ddpui.models.org import Org
 
@@ -168,6 +169,7 @@ def test_authenticate_org_user_success(org_user_accountmanager: OrgUser):
     response = authenticate_org_user(request, test_token.key, allowed_roles, require_org)
     assert response == request
     assert response.orguser == org_user_accountmanager
+    assert response.org == org_user_accountmanager.org
 
 
 @pytest.fixture
@@ -312,3 +314,26 @@ def test_fullaccess_reportviewer_success(org_user_reportviewer: OrgUser):
     with pytest.raises(HttpError) as excinfo:
         aou.authenticate(request, temp_token)
     assert str(excinfo.value) == UNAUTHORIZED
+
+
+# ====================================================================================
+def test_customauthmiddleware_sets_org(org_user_accountmanager: OrgUser):
+    cam = CustomAuthMiddleware()
+    request = Mock(headers={})
+    temp_token = token(org_user_accountmanager.user)
+    response = cam.authenticate(request, temp_token.key)
+    assert response.orguser == org_user_accountmanager
+    assert response.org == org_user_accountmanager.org
+    temp_token.delete()
+
+
+def test_customauthmiddleware_require_org(org_user_accountmanager: OrgUser):
+    cam = CustomAuthMiddleware()
+    request = Mock(headers={})
+    org_user_accountmanager.org = None
+    org_user_accountmanager.save()
+    temp_token = token(org_user_accountmanager.user)
+    with pytest.raises(HttpError) as excinfo:
+        cam.authenticate(request, temp_token.key)
+    assert str(excinfo.value) == "register an organization first"
+    temp_token.delete()
@@ -13,6 +13,8 @@ django.setup()
 from ninja.errors import HttpError
 from ddpui.tests.helper.test_airbyte_unit_schemas import *
 from ddpui import settings
+from ddpui.ddpprefect import AIRBYTESERVER
+from ddpui.models.org import Org, OrgPrefectBlockv1
 from ddpui.ddpairbyte.airbyte_service import (
     abreq,
     create_workspace,
@@ -39,6 +41,7 @@ from ddpui.ddpairbyte.airbyte_service import (
     get_destination_definition_specification,
     get_destinations,
     get_destination,
+    get_destination_cached,
     get_destination_definition,
     create_destination,
     update_destination,
@@ -133,6 +136,38 @@ def test_abreq_connection_error():
         assert str(excinfo.value) == "Error connecting to Airbyte server"
 
 
+@pytest.mark.django_db
+def test_abreq_routes_by_org_when_profile_flag_enabled():
+    """an explicit org is routed to its own airbyte server, even outside a request"""
+    org = Org.objects.create(name="org", slug="org")
+    OrgPrefectBlockv1.objects.create(
+        org=org, block_type=AIRBYTESERVER, block_id="block-id", block_name="org-airbyte-server"
+    )
+
+    with patch(
+        "ddpui.ddpairbyte.airbyte_service.flag_enabled", return_value=True
+    ) as mock_flag_enabled, patch(
+        "ddpui.ddpairbyte.airbyte_service.prefect_service.get_airbyte_server_block",
+        return_value={"host": "org-host", "port": 8001, "version": "v1", "token": "org-token"},
+    ) as mock_get_airbyte_server_block, patch(
+        "ddpui.ddpairbyte.airbyte_service.requests.post"
+    ) as mock_post:
+        mock_post.return_value.status_code = 200
+        mock_post.return_value.json.return_value = {"destinationId": "dest-id"}
+
+        result = abreq("destinations/create", {"name": "warehouse"}, org=org)
+
+    assert result == {"destinationId": "dest-id"}
+    mock_flag_enabled.assert_called_once_with("AIRBYTE_PROFILE", request_org_slug="org")
+    mock_get_airbyte_server_block.assert_called_once_with("org-airbyte-server")
+    mock_post.assert_called_once_with(
+        "http://org-host:8001/api/v1/destinations/create",
+        headers={"Authorization": "Basic org-token"},
+        json={"name": "warehouse"},
+        timeout=30,
+    )
+
+
 # def test_abreq_invalid_request_data():
 #     endpoint = "workspaces/create"
 #     req = {"invalid_key": "invalid_value"}
@@ -1042,6 +1077,38 @@ def test_get_destination_failure():
         assert str(excinfo.value) == "destination not found"
 
 
+@patch("ddpui.ddpairbyte.airbyte_service.RedisClient")
+def test_get_destination_cached_miss(mock_redis_client: Mock):
+    mock_redis = mock_redis_client.get_instance.return_value
+    mock_redis.get.return_value = None
+    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+        mock_response = Mock(spec=requests.Response)
+        mock_response.status_code = 200
+        mock_response.headers = {"Content-Type": "application/json"}
+        mock_response.json.return_value = {"destinationId": "the-destination"}
+        mock_post.return_value = mock_response
+
+        response = get_destination_cached("workspace-id", "destination_id")
+
+        assert response["destinationId"] == "the-destination"
+        mock_redis.set.assert_called_once_with(
+            "airbyte-destination:destination_id",
+            '{"destinationId": "the-destination"}',
+            ex=300,
+        )
+
+
+@patch("ddpui.ddpairbyte.airbyte_service.RedisClient")
+def test_get_destination_cached_hit(mock_redis_client: Mock):
+    mock_redis = mock_redis_client.get_instance.return_value
+    mock_redis.get.return_value = b'{"destinationId": "the-destination"}'
+    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+        response = get_destination_cached("workspace-id", "destination_id")
+
+        assert response["destinationId"] == "the-destination"
+        mock_post.assert_not_called()
+
+
 def test_create_destination_success():
     with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
         mock_response = Mock(spec=requests.Response)
@@ -1092,7 +1159,8 @@ def test_create_destination_failure():
         assert str(excinfo.value) == "failed to create destination"
 
 
-def test_update_destination_success():
+@patch("ddpui.ddpairbyte.airbyte_service.RedisClient")
+def test_update_destination_success(mock_redis_client: Mock):
     with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
         mock_response = Mock(spec=requests.Response)
         mock_response.status_code = 200
@@ -1103,6 +1171,9 @@ def test_update_destination_success():
         response = update_destination("destination_id", "name", {}, "destinationdef_id")
 
         assert response["destinationId"] == "the-destination"
+        mock_redis_client.get_instance.return_value.delete.assert_called_once_with(
+            "airbyte-destination:destination_id"
+        )
 
 
 def test_update_destination_failure_with_invalid_destination_id():
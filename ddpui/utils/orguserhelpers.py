@@ -4,7 +4,7 @@ from django.utils.text import slugify
 
 from ddpui.models.org_user import Invitation, InvitationSchema
 from ddpui.models.org_user import OrgUser, OrgUserResponse, OrgUserRole
-from ddpui.models.org import OrgWarehouse, OrgType
+from ddpui.models.org import OrgSchema, OrgWarehouse, OrgType
 from ddpui.models.orgtnc import OrgTnC
 from ddpui.models.role_based_access import RolePermission
 
@@ -15,14 +15,21 @@ def from_orguser(orguser: OrgUser):
     orguser_new_role = orguser.new_role.slug if orguser.new_role else None
     permissions = []
     if orguser_new_role:
-        role_permissions = list(RolePermission.objects.filter(role=orguser.new_role).all())
+        role_permissions = list(
+            RolePermission.objects.filter(role=orguser.new_role).select_related("permission")
+        )
         permissions = [
             {"slug": item.permission.slug, "name": item.permission.name}
             for item in role_permissions
         ]
-    response = OrgUserResponse(
+    org = None
+    if orguser.org:
+        org = OrgSchema.from_orm(orguser.org)
+        org.tnc_accepted = OrgTnC.objects.filter(org=orguser.org).exists()
+    # the scalar fields come straight from the db, so they aren't validated again
+    return OrgUserResponse.construct(
         email=orguser.user.email,
-        org=orguser.org,
+        org=org,
         active=orguser.user.is_active,
         role=orguser.role,
         role_slug=slugify(OrgUserRole(orguser.role).name),
@@ -31,9 +38,6 @@ def from_orguser(orguser: OrgUser):
         wtype=warehouse.wtype if warehouse else None,
         is_demo=orguser.org.base_plan() == OrgType.DEMO if orguser.org else False,
     )
-    if orguser.org:
-        response.org.tnc_accepted = OrgTnC.objects.filter(org=orguser.org).exists()
-    return response
 
 
 def from_invitation(invitation: Invitation):
@@ -185,6 +185,45 @@ def delete_warehouse_credentials(warehouse: OrgWarehouse) -> None:
         pass
 
 
+def generate_pending_destination_name(warehouse: OrgWarehouse):
+    """generates the secret name for a warehouse's airbyte destination config"""
+    return f"pendingDestination-{warehouse.org.slug}-{warehouse.id}"
+
+
+def save_pending_destination(warehouse: OrgWarehouse, destination: dict):
+    """
+    saves the airbyte destination config for a warehouse until its destination is created
+    so that the config never has to go through the task broker
+    """
+    aws_sm = get_client()
+    secret_name = generate_pending_destination_name(warehouse)
+    response = aws_sm.create_secret(
+        Name=secret_name,
+        SecretString=json.dumps(destination),
+    )
+    logger.info("saved pending destination in secrets manager under name=" + response["Name"])
+    return secret_name
+
+
+def retrieve_pending_destination(warehouse: OrgWarehouse) -> dict | None:
+    """decodes and returns the saved airbyte destination config for a warehouse"""
+    aws_sm = get_client()
+    try:
+        response = aws_sm.get_secret_value(SecretId=generate_pending_destination_name(warehouse))
+    except Exception:  # skipcq PYL-W0703
+        return None
+    return json.loads(response["SecretString"]) if response and "SecretString" in response else None
+
+
+def delete_pending_destination(warehouse: OrgWarehouse) -> None:
+    """deletes the saved airbyte destination config for a warehouse"""
+    aws_sm = get_client()
+    try:
+        aws_sm.delete_secret(SecretId=generate_pending_destination_name(warehouse))
+    except Exception:  # skipcq PYL-W0703
+        pass
+
+
 def save_superset_usage_dashboard_credentials(credentials: dict):
     """saves superset usage dashboard user credentials under a predefined secret name"""
     aws_sm = get_client()
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ddpui.settings")
 
 application = get_wsgi_application()
+
+# pylint:disable=wrong-import-position
+from ddpui.routes import warm_api
+
+warm_api()